@@ -8,13 +8,32 @@ Provides color-coded logging that matches the C++ ncmpp program format:
 - [ERROR]   - Red
 - [DEBUG]   - Cyan
 - [SUCCESS] - Green
+
+When stdout is not a terminal, colors are left out (set NCMPP_COLOR=1 to keep
+them) and output is collected in a 64KB buffer that is flushed every second
+and at exit. Set NCMPP_LOG_UNBUFFERED=1 to disable the buffer.
+
+Messages take %-style arguments, as the logging module does, so callers can
+pass values rather than formatting them in.
 """
 
+import atexit
+import functools
+import io
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 
+FLUSH_INTERVAL = 1.0  # seconds between background flushes of buffered output
+
 class ColorLogger:
-    """Color logger that matches ncmpp C++ format."""
+    """Color logger that matches ncmpp C++ format.
+
+    The logging helpers are module-level functions, attached below as static
+    methods so existing ``ColorLogger.info(...)`` callers keep working.
+    """
 
     # ANSI color codes matching ncmpp
     GREEN = '\033[32m'
@@ -24,48 +43,169 @@ class ColorLogger:
     BLUE = '\033[34m'
     RESET = '\033[0m'
 
-    @staticmethod
-    def log(msg, level="INFO"):
-        """Log message with color coding matching ncmpp format."""
-        color_code = {
-            "INFO": '',  # Default foreground color
-            "WARN": ColorLogger.YELLOW,
-            "ERROR": ColorLogger.RED,
-            "DEBUG": ColorLogger.CYAN,
-            "SUCCESS": ColorLogger.GREEN
-        }.get(level, '')
-
-        print(f"{color_code}[{level}] {msg}{ColorLogger.RESET}")
-
-    @staticmethod
-    def info(msg):
-        """Log info message."""
-        ColorLogger.log(msg, "INFO")
-
-    @staticmethod
-    def warn(msg):
-        """Log warning message."""
-        ColorLogger.log(msg, "WARN")
-
-    @staticmethod
-    def error(msg):
-        """Log error message."""
-        ColorLogger.log(msg, "ERROR")
-
-    @staticmethod
-    def debug(msg):
-        """Log debug message."""
-        ColorLogger.log(msg, "DEBUG")
-
-    @staticmethod
-    def success(msg):
-        """Log success message."""
-        ColorLogger.log(msg, "SUCCESS")
-
-    @staticmethod
-    def path(path_str):
-        """Format a path in blue color."""
-        return f"{ColorLogger.BLUE}{path_str}{ColorLogger.RESET}"
+_stdout = sys.stdout
+
+def _isatty(stream):
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        # No stdout, or a closed one
+        return False
+
+_IS_TTY = _isatty(_stdout)
+# ncmpp.py sets NCMPP_COLOR=1 for the scripts whose output it relays to a terminal
+_COLOR = _IS_TTY or os.environ.get("NCMPP_COLOR") == "1"
+
+_ENCODING = getattr(_stdout, "encoding", None) or "utf-8"
+# Filenames that are not valid in the filesystem encoding arrive as surrogate
+# escapes; log them escaped instead of letting the write fail
+_ERRORS = "backslashreplace"
+
+def _level(prefix):
+    """Return a level prefix as (text, bytes encoded for stdout)."""
+    prefix = sys.intern(prefix)
+    return prefix, prefix.encode(_ENCODING, _ERRORS)
+
+# Preformatted "<color>[LEVEL] " prefixes, built once instead of per call
+_LEVELS = {
+    level: _level(f"{color_code if _COLOR else ''}[{level}] ")
+    for level, color_code in (
+        ("INFO", ''),  # Default foreground color
+        ("WARN", ColorLogger.YELLOW),
+        ("ERROR", ColorLogger.RED),
+        ("DEBUG", ColorLogger.CYAN),
+        ("SUCCESS", ColorLogger.GREEN),
+    )
+}
+_INFO = _LEVELS["INFO"]
+_WARN = _LEVELS["WARN"]
+_ERROR = _LEVELS["ERROR"]
+_DEBUG = _LEVELS["DEBUG"]
+_SUCCESS = _LEVELS["SUCCESS"]
+_SUFFIX = sys.intern(ColorLogger.RESET + "\n" if _COLOR else "\n")
+_SUFFIX_BYTES = _SUFFIX.encode(_ENCODING, _ERRORS)
+
+def _buffered():
+    # Only buffer while stdout is the real stream, so redirect_stdout
+    # and similar captures keep working
+    return _buf is not None and sys.stdout is _stdout
+
+def _write_text(out, text):
+    try:
+        out.write(text)
+    except UnicodeEncodeError:
+        # The stream's own error handler is usually strict; escape what its
+        # encoding cannot hold, as the buffered path does
+        encoding = getattr(out, "encoding", None) or "utf-8"
+        out.write(text.encode(encoding, _ERRORS).decode(encoding))
+
+def write(text):
+    """Write preformatted text to the log stream."""
+    with _buf_lock:
+        if _buffered():
+            _buf.write(text.encode(_ENCODING, _ERRORS))
+        else:
+            _write_text(sys.stdout, text)
+
+def flush():
+    """Flush any buffered log output."""
+    if _buf is not None:
+        with _buf_lock:
+            _buf.flush()
+    sys.stdout.flush()
+
+def _emit(level, msg, args=()):
+    if args:
+        msg = msg % args
+    # The lock keeps lines whole when several threads log at once
+    with _buf_lock:
+        if _buffered():
+            # Prefix and suffix are pre-encoded, so each line costs one
+            # encode and one write into the binary buffer
+            _buf.write(level[1] + str(msg).encode(_ENCODING, _ERRORS) + _SUFFIX_BYTES)
+        else:
+            out = sys.stdout
+            out.write(level[0])
+            _write_text(out, str(msg))
+            out.write(_SUFFIX)
+
+def log(msg, level="INFO"):
+    """Log message with color coding matching ncmpp format."""
+    _emit(_LEVELS.get(level) or _level(f"[{level}] "), msg)
+
+def info(msg, *args):
+    """Log info message."""
+    _emit(_INFO, msg, args)
+
+def warn(msg, *args):
+    """Log warning message."""
+    _emit(_WARN, msg, args)
+
+def error(msg, *args):
+    """Log error message."""
+    _emit(_ERROR, msg, args)
+
+def debug(msg, *args):
+    """Log debug message."""
+    _emit(_DEBUG, msg, args)
+
+def success(msg, *args):
+    """Log success message."""
+    _emit(_SUCCESS, msg, args)
+
+@functools.lru_cache(maxsize=256)
+def path(path_str):
+    """Format a path in blue color (memoized; paths repeat across messages)."""
+    if not _COLOR:
+        return str(path_str)
+    return f"{ColorLogger.BLUE}{path_str}{ColorLogger.RESET}"
+
+ColorLogger.log = staticmethod(log)
+ColorLogger.write = staticmethod(write)
+ColorLogger.flush = staticmethod(flush)
+ColorLogger.info = staticmethod(info)
+ColorLogger.warn = staticmethod(warn)
+ColorLogger.error = staticmethod(error)
+ColorLogger.debug = staticmethod(debug)
+ColorLogger.success = staticmethod(success)
+ColorLogger.path = staticmethod(path)
+
+def _open_buffer():
+    """Wrap stdout in a 64KB buffer, or return None to write through."""
+    if os.environ.get("NCMPP_LOG_UNBUFFERED") == "1":
+        return None
+    try:
+        if _IS_TTY:
+            return None
+        fd = os.dup(_stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        # No stdout, or one without a real file descriptor
+        return None
+
+    # A duplicate descriptor lets the buffer be closed without closing stdout
+    buf = io.open(fd, 'wb', buffering=65536)
+
+    def flush_periodically():
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            with _buf_lock:
+                buf.flush()
+
+    threading.Thread(target=flush_periodically, daemon=True).start()
+    atexit.register(flush)
+    return buf
+
+_buf_lock = threading.Lock()
+_buf = _open_buffer()
+
+def _reset_lock_after_fork():
+    # The flush thread may hold the lock at fork time, and it is not running
+    # in the child to release it
+    global _buf_lock
+    _buf_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
 
 # Global instance for easy import
 logger = ColorLogger()
@@ -3,33 +3,35 @@
 embed_cover.py - Embed cover images into music files and delete the images
 
 Usage: python embed_cover.py filepath_with_no_ext_to_deal.txt
+       python embed_cover.py -    (read paths from stdin)
 
 This script reads a file containing paths without extensions, finds corresponding
 .jpg cover images and .flac/.mp3 music files, embeds the cover into the music file,
 and then deletes the cover image.
+
+Per-file progress messages are only shown when NCMPP_VERBOSE=1 is set;
+warnings, errors and the final summary are always shown.
 """
 
 import sys
 import os
+import time
+import io
+import mmap
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from typing import cast
 import mutagen
 from mutagen.flac import FLAC, Picture
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3
+from mutagen.id3 import ID3, ID3NoHeaderError
 from mutagen.id3._frames import APIC
 import mimetypes
 
-# Import color logging
-sys.path.append(str(Path(__file__).parent))
+# Import color logging (the script directory is already on sys.path)
 try:
-    from color_log import ColorLogger
-    log = ColorLogger.log
-    info = ColorLogger.info
-    warn = ColorLogger.warn
-    error = ColorLogger.error
-    success = ColorLogger.success
-    path = ColorLogger.path
+    from color_log import log, info, warn, error, success, path, write
 except ImportError:
     # Fallback without colors
     def log(msg, level="INFO"): print(f"[{level}] {msg}")
@@ -38,6 +40,40 @@ except ImportError:
     error = lambda msg: log(msg, "ERROR")
     success = lambda msg: log(msg, "SUCCESS")
     path = lambda p: str(p)
+    write = lambda text: sys.stdout.write(text)
+
+
+# Worker processes used to embed covers in parallel
+WORKERS = os.cpu_count() or 1
+
+# Per-file progress messages are opt-in; they dominate output on big batches
+VERBOSE = os.environ.get("NCMPP_VERBOSE") == "1"
+
+
+# Common cover suffixes, resolved without touching the mimetypes database
+COVER_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+
+# Spare tag space left after a cover is embedded (~64KB extra per file), so
+# later re-embeds usually fit in place instead of rewriting the audio data
+COVER_PADDING = 65536
+
+
+def cover_padding(info):
+    """mutagen padding callback: keep existing spare space if the new tag fits."""
+    return info.padding if info.padding >= 0 else COVER_PADDING
+
+
+def guess_cover_mime(cover_file_path):
+    """Return the MIME type of a cover image, defaulting to JPEG."""
+    mime_type = COVER_MIME_TYPES.get(cover_file_path.suffix.lower())
+    if mime_type is None:
+        mime_type = mimetypes.guess_type(cover_file_path.name)[0] or 'image/jpeg'
+    return mime_type
 
 
 def embed_cover_into_music(music_file_path, cover_file_path):
@@ -63,25 +99,30 @@ def embed_cover_into_flac(music_file_path, cover_file_path):
     try:
         audio = FLAC(music_file_path)
 
-        # Read the cover image
-        with open(cover_file_path, 'rb') as f:
-            cover_data = f.read()
-
-        # Create a Picture object
-        picture = Picture()
-        picture.type = 3  # Front cover
-        picture.desc = 'Front Cover'
-        picture.mime = mimetypes.guess_type(str(cover_file_path))[0] or 'image/jpeg'
-        picture.data = cover_data
-
-        # Remove existing pictures
-        audio.clear_pictures()
-
-        # Add the new cover
-        audio.add_picture(picture)
-        audio.save()
-
-        success(f"Successfully embedded cover into FLAC: {path(music_file_path.name)}")
+        # Map the cover image rather than read() it, which saves the one copy
+        # read() makes (mutagen still copies it while building the picture
+        # block). The mapping must stay open until the file is saved; an empty
+        # file cannot be mapped, so that is read as before
+        with open(cover_file_path, 'rb') as f, \
+             (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+              if os.fstat(f.fileno()).st_size else nullcontext(f.read())) as cover_data:
+            # Create a Picture object
+            picture = Picture()
+            picture.type = 3  # Front cover
+            picture.desc = 'Front Cover'
+            picture.mime = guess_cover_mime(cover_file_path)
+            picture.data = cover_data
+
+            # Remove existing pictures; freshly converted files have none
+            if audio.pictures:
+                audio.clear_pictures()
+
+            # Add the new cover
+            audio.add_picture(picture)
+            audio.save(padding=cover_padding)
+
+        if VERBOSE:
+            success(f"Successfully embedded cover into FLAC: {path(music_file_path.name)}")
         return True
 
     except Exception as e:
@@ -92,27 +133,23 @@ def embed_cover_into_flac(music_file_path, cover_file_path):
 def embed_cover_into_mp3(music_file_path, cover_file_path):
     """Embed cover image into MP3 file."""
     try:
-        audio = MP3(music_file_path, ID3=ID3)
+        # Load only the ID3 tag; the MPEG stream info from MP3() is never used
+        try:
+            tags = ID3(music_file_path)
+        except ID3NoHeaderError:
+            tags = ID3()
 
-        # Read the cover image
+        # Read the cover image (APIC frames only accept bytes, so it
+        # cannot be mapped like in the FLAC path)
         with open(cover_file_path, 'rb') as f:
             cover_data = f.read()
 
         # Determine MIME type
-        mime_type = mimetypes.guess_type(str(cover_file_path))[0] or 'image/jpeg'
-
-        # Ensure ID3 tags exist and get a typed reference
-        tags = audio.tags
-        if tags is None:
-            try:
-                audio.add_tags()
-            except Exception:
-                audio.tags = ID3()
-            tags = audio.tags
-        tags = cast(ID3, tags)
+        mime_type = guess_cover_mime(cover_file_path)
 
-        # Remove existing APIC frames
-        tags.delall('APIC')
+        # Remove existing APIC frames; freshly converted files have none
+        if tags.getall('APIC'):
+            tags.delall('APIC')
 
         # Add the new cover
         tags.add(
@@ -124,9 +161,10 @@ def embed_cover_into_mp3(music_file_path, cover_file_path):
                 data=cover_data
             )
         )
-        audio.save()
+        tags.save(music_file_path, padding=cover_padding)
 
-        success(f"Successfully embedded cover into MP3: {path(music_file_path.name)}")
+        if VERBOSE:
+            success(f"Successfully embedded cover into MP3: {path(music_file_path.name)}")
         return True
 
     except Exception as e:
@@ -134,22 +172,55 @@ def embed_cover_into_mp3(music_file_path, cover_file_path):
         return False
 
 
-def process_file(base_path):
-    """Process a single base path (without extension)."""
-    base_path = Path(base_path.strip())
+# Directory listings by path, shared by all tracks in the same directory
+_dir_names = {}
 
-    # Look for cover image (.jpg) - handle filenames with dots correctly
-    cover_file = base_path.parent / (base_path.name + '.jpg')
-    if not cover_file.exists():
-        warn(f"Cover image not found: {path(cover_file)}")
-        return False
+
+def list_dir_names(dir_path):
+    """Return the set of entry names in a directory, cached per directory.
+
+    Tracks from the same album share a directory, so one listing answers
+    every existence check for them.
+    """
+    names = _dir_names.get(dir_path)
+    if names is None:
+        try:
+            names = frozenset(os.listdir(dir_path))
+        except OSError:
+            names = frozenset()
+        _dir_names[dir_path] = names
+    return names
+
+
+def process_file(base_path, streaming=False):
+    """Process a single base path (without extension).
+
+    Set streaming when paths arrive while ncmpp is still converting.
+    """
+    base_path = Path(base_path.strip())
+    parent = str(base_path.parent)
+    cover_file = base_path.with_name(base_path.name + '.jpg')
+
+    if streaming:
+        # ncmpp has only just written this track, so a cached listing of its
+        # directory would predate it; check the few candidate names directly
+        names = {name for name in (cover_file.name,
+                                   base_path.name + '.flac',
+                                   base_path.name + '.mp3')
+                 if os.path.exists(os.path.join(parent, name))}
+    else:
+        names = list_dir_names(parent)
 
     # Look for music files (.flac or .mp3) - handle filenames with dots correctly
     music_files = []
     for ext in ['.flac', '.mp3']:
-        music_file = base_path.parent / (base_path.name + ext)
-        if music_file.exists():
-            music_files.append(music_file)
+        if base_path.name + ext in names:
+            music_files.append(base_path.with_name(base_path.name + ext))
+
+    # Look for cover image (.jpg) - handle filenames with dots correctly
+    if cover_file.name not in names:
+        warn(f"Cover image not found: {path(cover_file)}")
+        return False
 
     if not music_files:
         warn(f"No music files found for: {path(base_path)}")
@@ -157,7 +228,8 @@ def process_file(base_path):
 
     success_count = 0
     for music_file in music_files:
-        info(f"Processing: {path(music_file.name)}")
+        if VERBOSE:
+            info(f"Processing: {path(music_file.name)}")
 
         if embed_cover_into_music(music_file, cover_file):
             success_count += 1
@@ -166,45 +238,112 @@ def process_file(base_path):
     if success_count > 0:
         try:
             cover_file.unlink()
-            info(f"Deleted cover image: {path(cover_file.name)}")
+            if VERBOSE:
+                info(f"Deleted cover image: {path(cover_file.name)}")
         except Exception as e:
             warn(f"Could not delete cover image: {e}")
 
     return success_count > 0
 
 
+def pool_context():
+    """Return the multiprocessing context for the embedding pool.
+
+    Linux keeps its default fork. macOS would otherwise spawn a fresh
+    interpreter per worker, so forkserver is used there instead; Windows
+    only supports spawn.
+    """
+    if sys.platform == "darwin":
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def process_line(numbered_line, streaming=False):
+    """Process one numbered input line, returning (ok, captured log output).
+
+    Runs in a worker process; log output is captured so the parent can print
+    each file's messages as one block instead of interleaving workers.
+    """
+    line_num, line = numbered_line
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        if VERBOSE:
+            info(f"Processing line {line_num}: {path(line)}")
+        ok = process_file(line, streaming)
+    return ok, buf.getvalue()
+
+
 def main():
     """Main function."""
     if len(sys.argv) != 2:
         error("Usage: python embed_cover.py filepath_with_no_ext_to_deal.txt")
         sys.exit(1)
 
-    input_file = Path(sys.argv[1])
+    if sys.argv[1] == "-":
+        input_file = None
+        info("Processing paths from stdin")
+    else:
+        input_file = Path(sys.argv[1])
 
-    if not input_file.exists():
-        error(f"Input file not found: {path(input_file)}")
-        sys.exit(1)
+        if not input_file.exists():
+            error(f"Input file not found: {path(input_file)}")
+            sys.exit(1)
 
-    info(f"Processing file: {path(input_file)}")
+        info(f"Processing file: {path(input_file)}")
 
     success_count = 0
     failure_count = 0
+    start_time = time.perf_counter()
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-
-            info(f"Processing line {line_num}: {path(line)}")
-
-            if process_file(line):
-                success_count += 1
+    def report(result):
+        nonlocal success_count, failure_count
+        ok, output = result
+        write(output)
+        if ok:
+            success_count += 1
+        else:
+            failure_count += 1
+
+    # surrogateescape round-trips filenames that are not valid UTF-8
+    if input_file is None:
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='surrogateescape')
+    else:
+        f = open(input_file, 'r', encoding='utf-8', errors='surrogateescape')
+
+    with f:
+        # Skip empty lines, keeping the original line numbers for logging
+        lines = ((line_num, line.strip()) for line_num, line in enumerate(f, 1) if line.strip())
+
+        if input_file is None:
+            # Lines are dispatched as they are read, so the input may be a
+            # pipe that ncmpp is still writing finished files to
+            with ProcessPoolExecutor(WORKERS, mp_context=pool_context()) as executor:
+                pending = deque()
+                for numbered_line in lines:
+                    pending.append(executor.submit(process_line, numbered_line, True))
+
+                    # Report finished tracks in input order without waiting for EOF
+                    while pending and pending[0].done():
+                        report(pending.popleft().result())
+
+                for future in pending:
+                    report(future.result())
+        else:
+            lines = list(lines)
+            if len(lines) <= 1:
+                # Starting a pool costs more than embedding a single cover
+                for numbered_line in lines:
+                    report(process_line(numbered_line))
             else:
-                failure_count += 1
+                # Hand workers several tracks at a time to cut IPC round trips
+                chunksize = max(1, len(lines) // (WORKERS + 2))
+                with ProcessPoolExecutor(WORKERS, mp_context=pool_context()) as executor:
+                    for result in executor.map(process_line, lines, chunksize=chunksize):
+                        report(result)
 
+    elapsed = time.perf_counter() - start_time
     success("Processing complete!")
-    success(f"Successfully processed: {success_count} files")
+    success(f"Embedded covers into {success_count} files in {elapsed:.2f}s")
     warn(f"Failed to process: {failure_count} files")
 
 
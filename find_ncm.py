@@ -7,19 +7,14 @@ import sys
 import os
 from pathlib import Path
 
-# Import color logging
-sys.path.append(str(Path(__file__).parent))
+# Import color logging (the script directory is already on sys.path)
 from typing import Any
 ColorLogger: Any = None
 try:
     # Prefer importing the real ColorLogger when available
     from color_log import ColorLogger as _ColorLogger
+    from color_log import log, info, warn, error, success
     ColorLogger = _ColorLogger
-    log = ColorLogger.log
-    info = ColorLogger.info
-    warn = ColorLogger.warn
-    error = ColorLogger.error
-    success = ColorLogger.success
 except ImportError:
     # Fallback without colors: provide minimal functions and a simple namespace
     from types import SimpleNamespace
@@ -43,6 +38,22 @@ except ImportError:
     error = ColorLogger.error
     success = ColorLogger.success
 
+def _walk_ncm(root):
+    """Yield the path of every .ncm file under root as a string."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.ncm'):
+                        yield entry.path
+        except OSError:
+            # Skip unreadable directories, as rglob does
+            continue
+
 def generate_ncm_lists(music_dir):
     """
     Scans a directory for .ncm files and generates input and output lists for ncmpp.
@@ -53,28 +64,33 @@ def generate_ncm_lists(music_dir):
         error(f"Directory not found at '{music_dir}'")
         return
 
-    info(f"Scanning for .ncm files in '{ColorLogger.path(music_path.resolve())}'...")
+    # Resolve the root once; every path found under it extends this string,
+    # so no file needs its own resolve() and the readlink/stat calls it makes
+    root = str(music_path.resolve())
+    info(f"Scanning for .ncm files in '{ColorLogger.path(root)}'...")
 
-    ncm_files = list(music_path.rglob('*.ncm'))
+    ncm_files = list(_walk_ncm(root))
 
     if not ncm_files:
-        warn(f"No .ncm files found in '{ColorLogger.path(music_path.resolve())}'.")
+        warn(f"No .ncm files found in '{ColorLogger.path(root)}'.")
         return
 
     output_dir = Path.cwd()
     input_list_path = output_dir / 'ncm_input.txt'
     output_list_path = output_dir / 'ncm_output.txt'
 
-    with open(input_list_path, 'w', encoding='utf-8') as f_in, \
-         open(output_list_path, 'w', encoding='utf-8') as f_out:
-        for ncm_file in ncm_files:
-            # Write the full path to the input file
-            f_in.write(str(ncm_file.resolve()) + '\n')
-
-            # Write the desired output path (without .ncm extension) to the current directory
-            # Use stem to preserve full filename including dots
-            base_name = ncm_file.stem
-            f_out.write(str(ncm_file.parent / base_name) + '\n')
+    # Write each list as one pre-encoded blob; fsencode gives back the exact
+    # bytes of each filename, even ones that are not valid UTF-8. The final
+    # newline is written on its own rather than appended, which would copy
+    # the whole joined list once more
+    with open(input_list_path, 'wb') as f_in, \
+         open(output_list_path, 'wb') as f_out:
+        f_in.write(os.fsencode('\n'.join(ncm_files)))
+        f_in.write(b'\n')
+        # Output paths slice off only the .ncm extension so filenames
+        # containing dots are preserved
+        f_out.write(os.fsencode('\n'.join([ncm_file[:-4] for ncm_file in ncm_files])))
+        f_out.write(b'\n')
 
     success(f"Generated '{ColorLogger.path(input_list_path.name)}' and '{ColorLogger.path(output_list_path.name)}' in '{ColorLogger.path(output_dir)}'")
     success(f"Found {len(ncm_files)} .ncm files.")
@@ -14,22 +14,29 @@ This script:
 
 import sys
 import os
+import re
+import shutil
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
 from pathlib import Path
 
 from typing import Any
 ColorLogger: Any = None
-# Import color logging
-sys.path.append(str(Path(__file__).parent))
+# Import color logging (the script directory is already on sys.path)
 try:
     # Prefer importing the module so we don't introduce a conflicting class
     import color_log as _color_log
     ColorLogger = _color_log.ColorLogger
-    log = ColorLogger.log
-    info = ColorLogger.info
-    warn = ColorLogger.warn
-    error = ColorLogger.error
-    success = ColorLogger.success
+    log = _color_log.log
+    info = _color_log.info
+    warn = _color_log.warn
+    error = _color_log.error
+    success = _color_log.success
+    write = _color_log.write
+    flush = _color_log.flush
 except Exception:
     # Fallback without colors — provide a minimal fallback class
     class _FallbackColorLogger:
@@ -42,20 +49,28 @@ except Exception:
             print(f"[{level}] {msg}")
 
         @staticmethod
-        def info(msg):
-            _FallbackColorLogger.log(msg, "INFO")
+        def info(msg, *args):
+            _FallbackColorLogger.log(msg % args if args else msg, "INFO")
+
+        @staticmethod
+        def warn(msg, *args):
+            _FallbackColorLogger.log(msg % args if args else msg, "WARN")
+
+        @staticmethod
+        def error(msg, *args):
+            _FallbackColorLogger.log(msg % args if args else msg, "ERROR")
 
         @staticmethod
-        def warn(msg):
-            _FallbackColorLogger.log(msg, "WARN")
+        def success(msg, *args):
+            _FallbackColorLogger.log(msg % args if args else msg, "SUCCESS")
 
         @staticmethod
-        def error(msg):
-            _FallbackColorLogger.log(msg, "ERROR")
+        def write(text):
+            sys.stdout.write(text)
 
         @staticmethod
-        def success(msg):
-            _FallbackColorLogger.log(msg, "SUCCESS")
+        def flush():
+            sys.stdout.flush()
 
     ColorLogger = _FallbackColorLogger
     # Expose the same helpers the real ColorLogger provides
@@ -64,6 +79,123 @@ except Exception:
     warn = ColorLogger.warn
     error = ColorLogger.error
     success = ColorLogger.success
+    write = ColorLogger.write
+    flush = ColorLogger.flush
+
+
+# The ncmpp binary is looked up once: a local build is used if there is one,
+# otherwise the one on PATH
+LOCAL_NCMPP = Path(__file__).parent / "build" / "ncmpp"
+if os.access(LOCAL_NCMPP, os.X_OK):
+    NCMPP_CMD = str(LOCAL_NCMPP)
+else:
+    NCMPP_CMD = shutil.which("ncmpp")
+
+# Extensions ncmpp writes; a .ncm file with a sibling of the same stem and
+# one of these extensions has already been converted, unless its .jpg cover
+# is still there too, as embed_cover.py deletes it only once it is embedded
+CONVERTED_EXTS = ('.flac', '.mp3')
+
+# Filesystems whose listings are served from memory, and network filesystems
+# whose listings each wait on a server round trip (as do all fuse.* types)
+MEMORY_FS_TYPES = {'tmpfs', 'ramfs'}
+NETWORK_FS_TYPES = {'nfs', 'nfs4', 'cifs', 'smb3', '9p'}
+
+# Returned by find_ncm_files in place of the input list path when every .ncm
+# file it found is already converted, so there is nothing to do
+ALL_CONVERTED = object()
+
+
+def _scan_dir(dir_path):
+    """List one directory, returning its subdirectories, its .ncm files that
+    still need converting, and how many were skipped as already converted."""
+    subdirs = []
+    ncm_files = []
+    names = set()
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                # DirEntry caches the type from the listing, so no extra stat
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                else:
+                    names.add(entry.name)
+                    if entry.name.endswith('.ncm'):
+                        ncm_files.append((entry.name[:-4], entry.path))
+    except OSError:
+        # Skip unreadable directories, as rglob does
+        pass
+
+    # Check for converted siblings against this same listing rather than
+    # stat'ing each candidate output path; plain string slicing throughout,
+    # with no Path objects or os.path splitting per file
+    pending = [path for stem, path in ncm_files
+               if stem + '.jpg' in names
+               or not any(stem + ext in names for ext in CONVERTED_EXTS)]
+    return subdirs, pending, len(ncm_files) - len(pending)
+
+
+def _walk_ncm(root, max_workers):
+    """Yield (ncm_files, skipped) for every directory under root.
+
+    ncm_files are the paths of the directory's .ncm files that still need
+    converting; skipped counts those that were already converted.
+
+    Directories are listed concurrently on a thread pool, so their listing
+    latency overlaps; this matters most on cold caches and network mounts.
+    (io_uring cannot batch this: mainline kernels have no getdents opcode,
+    and the type info a statx op would give already comes from DirEntry.)
+    _pick_scanner chooses max_workers for the root's filesystem.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_dir, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, ncm_files, skipped = future.result()
+                pending.update(executor.submit(_scan_dir, d) for d in subdirs)
+                yield ncm_files, skipped
+
+
+def _walk_ncm_serial(root):
+    """Like _walk_ncm, but lists one directory at a time on this thread."""
+    stack = [root]
+    while stack:
+        subdirs, ncm_files, skipped = _scan_dir(stack.pop())
+        stack.extend(subdirs)
+        yield ncm_files, skipped
+
+
+def _fs_type(path):
+    """Return the type of the filesystem holding path, or None if unknown."""
+    try:
+        with open('/proc/self/mounts', encoding='utf-8', errors='surrogateescape') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None  # Not Linux
+
+    best_mount, fs_type = '', None
+    for mount_point, mount_type in mounts:
+        # Spaces and other special characters in mount points are octal escapes
+        mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), mount_point)
+        # The longest matching mount point wins; of equal ones, the last
+        # mounted, as it hides the rest
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                and len(mount_point) >= len(best_mount):
+            best_mount, fs_type = mount_point, mount_type
+    return fs_type
+
+
+def _pick_scanner(root):
+    """Choose how to walk root, based on the filesystem it is on."""
+    fs_type = _fs_type(root)
+    if fs_type in MEMORY_FS_TYPES:
+        # Listings never block, so threads would only add overhead
+        return _walk_ncm_serial
+    if fs_type in NETWORK_FS_TYPES or (fs_type or '').startswith('fuse.'):
+        # Latency dominates; keep many listings in flight
+        return partial(_walk_ncm, max_workers=32)
+    return partial(_walk_ncm, max_workers=8)
 
 
 def find_ncm_files(music_dir):
@@ -71,125 +203,210 @@ def find_ncm_files(music_dir):
     music_path = Path(music_dir)
 
     if not music_path.is_dir():
-        error(f"Directory not found at '{ColorLogger.path(music_dir)}'")
+        error("Directory not found at '%s'", ColorLogger.path(music_dir))
         return None, None
 
-    info(f"Scanning for .ncm files in '{ColorLogger.path(music_path.resolve())}'...")
+    # Resolve the root once; every path found under it extends this string,
+    # so no file needs its own resolve() and the readlink/stat calls it makes
+    root = str(music_path.resolve())
+    info("Scanning for .ncm files in '%s'...", ColorLogger.path(root))
+
+    ncm_files = []
+    skipped = 0
+    for dir_ncm_files, dir_skipped in _pick_scanner(root)(root):
+        ncm_files.extend(dir_ncm_files)
+        skipped += dir_skipped
 
-    ncm_files = list(music_path.rglob('*.ncm'))
+    if skipped:
+        info("Skipping %d .ncm files that are already converted.", skipped)
+
+    if not ncm_files and skipped:
+        return ALL_CONVERTED, None
 
     if not ncm_files:
-        info(f"No .ncm files found in '{ColorLogger.path(music_path.resolve())}'.")
+        info("No .ncm files found in '%s'.", ColorLogger.path(root))
         return None, None
 
     # Create temporary files for ncmpp
-    temp_dir = Path.cwd() / "ncmpp_temp"
-    temp_dir.mkdir(exist_ok=True)
+    # A private directory per run, so concurrent runs cannot clash
+    temp_dir = Path(tempfile.mkdtemp(prefix="ncmpp_"))
 
     input_list_path = temp_dir / "ncm_input.txt"
     output_list_path = temp_dir / "ncm_output.txt"
 
-    with open(input_list_path, 'w', encoding='utf-8') as f_in, \
-         open(output_list_path, 'w', encoding='utf-8') as f_out:
-        for ncm_file in ncm_files:
-            # Write the full path to the input file
-            f_in.write(str(ncm_file.resolve()) + '\n')
+    # Write each list as one pre-encoded blob; fsencode gives back the exact
+    # bytes of each filename, even ones that are not valid UTF-8. The final
+    # newline is written on its own rather than appended, which would copy
+    # the whole joined list once more
+    with open(input_list_path, 'wb') as f_in, \
+         open(output_list_path, 'wb') as f_out:
+        f_in.write(os.fsencode('\n'.join(ncm_files)))
+        f_in.write(b'\n')
+        # Output paths slice off only the .ncm extension so filenames
+        # containing dots are preserved
+        f_out.write(os.fsencode('\n'.join([ncm_file[:-4] for ncm_file in ncm_files])))
+        f_out.write(b'\n')
+
+    success("Found %d .ncm files.", len(ncm_files))
+    return input_list_path, output_list_path
 
-            # Write the desired output path (without .ncm extension)
-            # Use stem to preserve full filename including dots
-            base_name = ncm_file.stem
-            output_path = ncm_file.parent / base_name
-            f_out.write(str(output_path) + '\n')
 
-    success(f"Found {len(ncm_files)} .ncm files.")
-    return input_list_path, output_list_path
+def relay_output(stream):
+    """Echo lines from a child process's output through the logger."""
+    for line in stream:
+        write(line)
+
 
+def run_ncmpp(input_file, output_file, done_fd=None):
+    """Run the ncmpp binary to convert files.
 
-def run_ncmpp(input_file, output_file):
-    """Run the ncmpp binary to convert files."""
+    If done_fd is given, ncmpp writes each finished output path to it.
+    """
     info("Running ncmpp to convert files...")
 
     try:
-        # Check if ncmpp is in PATH
-        try:
-            subprocess.run(["ncmpp", "--help"], capture_output=True, check=True)
-            ncmpp_cmd = "ncmpp"
+        if NCMPP_CMD is None:
+            error("ncmpp binary not found in ./build/ncmpp or PATH")
+            return False
+        elif NCMPP_CMD == str(LOCAL_NCMPP):
+            info("Using local ncmpp: %s", ColorLogger.path(NCMPP_CMD))
+        else:
             info("Using ncmpp from PATH")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Use local ncmpp
-            ncmpp_path = Path(__file__).parent / "build" / "ncmpp"
-            if not ncmpp_path.exists():
-                error("ncmpp binary not found in PATH or ./build/ncmpp")
-                return False
-            ncmpp_cmd = str(ncmpp_path)
-            info(f"Using local ncmpp: {ColorLogger.path(ncmpp_path)}")
 
         cmd = [
-            ncmpp_cmd,
+            NCMPP_CMD,
             "-i", str(input_file),
             "-o", str(output_file),
             "-s"  # Show timing
         ]
-
-        info(f"Executing: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        pass_fds = ()
+        if done_fd is not None:
+            cmd += ["-d", f"/dev/fd/{done_fd}"]
+            pass_fds = (done_fd,)
+
+        info("Executing: %s", ' '.join(cmd))
+        # ncmpp writes its progress straight to our stdout; only stderr is
+        # captured, for error reporting. pass_fds implies close_fds, which
+        # Python 3.9+ does with close_range rather than an fd-by-fd sweep
+        flush()
+        result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True,
+                                errors="replace", pass_fds=pass_fds)
+
+        # ncmpp exits 0 even when single files fail, so always show stderr
+        if result.stderr:
+            write(result.stderr)
 
         if result.returncode == 0:
             success("ncmpp conversion completed successfully!")
-            if result.stdout:
-                info(result.stdout)
             return True
         else:
-            error("Error running ncmpp:")
-            error(result.stderr)
+            error("Error running ncmpp: exited with code %d", result.returncode)
             return False
 
     except Exception as e:
-        error(f"Error running ncmpp: {e}")
+        error("Error running ncmpp: %s", e)
         return False
 
 
-def run_embed_cover(output_file):
-    """Run embed_cover.py to embed covers."""
+def start_embed_cover(cover_list, stdin=None):
+    """Start embed_cover.py in the background to embed covers.
+
+    cover_list is the path list to read, or "-" to read paths from stdin.
+    Returns the running process and the thread relaying its output, or
+    None if it could not be started.
+    """
     info("Running embed_cover.py to embed cover images...")
 
     try:
-        # Check if we're in the right environment
-        if Path("ncmpp_env").exists():
-            activate_script = Path("ncmpp_env") / "bin" / "activate"
-            cmd = f"source {activate_script} && python embed_cover.py {output_file}"
-            info("Using virtual environment for embed_cover.py")
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        # Run the virtual environment's interpreter directly if there is one;
+        # activating it is only a PATH change, so no shell is needed
+        if os.name == "nt":
+            venv_python = Path("ncmpp_env") / "Scripts" / "python.exe"
         else:
-            cmd = [sys.executable, "embed_cover.py", str(output_file)]
-            info(f"Executing: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            success("Cover embedding completed successfully!")
-            if result.stdout:
-                info(result.stdout)
-            return True
+            venv_python = Path("ncmpp_env") / "bin" / "python"
+        if venv_python.exists():
+            python_cmd = str(venv_python)
+            info("Using virtual environment for embed_cover.py")
         else:
-            error("Error running embed_cover.py:")
-            error(result.stderr)
-            return False
-
+            python_cmd = sys.executable
+
+        cmd = [python_cmd, "embed_cover.py", str(cover_list)]
+        info("Executing: %s", ' '.join(cmd))
+        # Python opens its fds non-inheritable, so the child cannot pick up
+        # stray ones (such as the write end of ncmpp's done pipe) even without
+        # close_fds; leaving it off skips the close sweep and lets subprocess
+        # spawn with posix_spawn
+        env = None
+        if sys.stdout.isatty():
+            # Its output reaches the terminal through a pipe, so ask it to
+            # keep the colors it would use when writing there directly
+            env = dict(os.environ, NCMPP_COLOR="1")
+        proc = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True,
+                                errors="replace", bufsize=1, close_fds=False,
+                                env=env)
     except Exception as e:
-        error(f"Error running embed_cover.py: {e}")
+        error("Error running embed_cover.py: %s", e)
+        return None
+
+    # Relay its output from a thread so ncmpp's output can be streamed meanwhile
+    relay = threading.Thread(target=relay_output, args=(proc.stdout,), daemon=True)
+    relay.start()
+    return proc, relay
+
+
+def finish_embed_cover(embed):
+    """Wait for embed_cover.py from start_embed_cover and report how it went."""
+    proc, relay = embed
+    returncode = proc.wait()
+    relay.join()
+    proc.stdout.close()
+
+    if returncode == 0:
+        success("Cover embedding completed successfully!")
+        return True
+    else:
+        error("Error running embed_cover.py: exited with code %d", returncode)
         return False
 
 
+def run_pipeline(input_file, output_file):
+    """Convert with ncmpp while embedding covers into files as they finish.
+
+    ncmpp writes each finished output path into a pipe that embed_cover.py
+    reads, so the two stages overlap instead of running back to back.
+    Returns (converted, embedded), or None if the pipe could not be set up.
+    """
+    if os.name != "posix":
+        return None  # ncmpp is handed the pipe as /dev/fd/N
+
+    read_fd, write_fd = os.pipe()
+    try:
+        embed = start_embed_cover("-", stdin=read_fd)
+    finally:
+        os.close(read_fd)
+    if embed is None:
+        os.close(write_fd)
+        return None
+
+    try:
+        # Once ncmpp exits and this end is closed, embed_cover.py sees EOF
+        converted = run_ncmpp(input_file, output_file, done_fd=write_fd)
+    finally:
+        os.close(write_fd)
+
+    embedded = finish_embed_cover(embed)
+    return converted, embedded
+
+
 def cleanup_temp_files(temp_dir):
     """Clean up temporary files."""
     try:
         if temp_dir.exists():
-            for file in temp_dir.iterdir():
-                file.unlink()
-            temp_dir.rmdir()
-            success(f"Cleaned up temporary files in {temp_dir}")
+            shutil.rmtree(temp_dir)
+            success("Cleaned up temporary files in %s", temp_dir)
     except Exception as e:
-        warn(f"Could not clean up temp files: {e}")
+        warn("Could not clean up temp files: %s", e)
 
 
 def main():
@@ -201,21 +418,35 @@ def main():
     music_dir = sys.argv[1]
 
     info("=== NCM All-in-One Processing Tool ===")
-    info(f"Processing directory: {ColorLogger.path(music_dir)}")
+    info("Processing directory: %s", ColorLogger.path(music_dir))
 
     # Step 1: Find NCM files and generate lists
     input_file, output_file = find_ncm_files(music_dir)
+    if input_file is ALL_CONVERTED:
+        success("All .ncm files are already converted; nothing to do.")
+        success("=== Processing Complete ===")
+        return
     if not input_file or not output_file:
         sys.exit(1)
 
-    # Step 2: Run ncmpp to convert files
-    if not run_ncmpp(input_file, output_file):
-        error("Conversion failed. Skipping cover embedding.")
+    # Steps 2 and 3: Run ncmpp to convert files, embedding covers as they finish
+    result = run_pipeline(input_file, output_file)
+    if result is None:
+        # No pipe support; convert everything first, then embed covers
+        converted = run_ncmpp(input_file, output_file)
+        embedded = False
+        if converted:
+            embed = start_embed_cover(output_file)
+            embedded = embed is not None and finish_embed_cover(embed)
+    else:
+        converted, embedded = result
+
+    if not converted:
+        error("Conversion failed.")
         cleanup_temp_files(input_file.parent)
         sys.exit(1)
 
-    # Step 3: Run embed_cover.py to embed covers
-    if not run_embed_cover(output_file):
+    if not embedded:
         error("Cover embedding failed.")
 
     # Step 4: Clean up
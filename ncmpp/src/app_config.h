@@ -16,6 +16,7 @@
  * - Timing display preference
  * - Input/output file list paths for batch mode
  * - Output directory for fallback mode
+ * - Optional list of finished output paths for downstream consumers
  */
 struct app_config {
     /** @brief Number of threads for concurrent processing */
@@ -32,4 +33,7 @@ struct app_config {
     
     /** @brief Output directory path (fallback mode) */
     std::filesystem::path output_dir;
+
+    /** @brief Path that finished output paths are written to, one per line (optional) */
+    std::string done_file_list;
 };
@@ -7,6 +7,7 @@
 #include <chrono>
 #include <mutex>
 #include <functional>
+#include <csignal>
 
 using namespace std;
 
@@ -77,10 +78,26 @@ int ncm_app::run() {
     log("  Input file: " + (config_.input_file_list.empty() ? "<auto-detect>" : config_.input_file_list));
     log("  Output file: " + (config_.output_file_list.empty() ? config_.output_dir.string() : config_.output_file_list));
     log("  Show timing: " + string(config_.show_time ? "true" : "false"));
+    if (!config_.done_file_list.empty()) {
+        log("  Done list: " + config_.done_file_list);
+    }
 
     auto start = chrono::steady_clock::now();
 
     try {
+        if (!config_.done_file_list.empty()) {
+#ifndef _WIN32
+            // The done list may be a pipe; if its reader goes away, keep
+            // converting instead of being killed by SIGPIPE
+            signal(SIGPIPE, SIG_IGN);
+#endif
+            done_list_.open(config_.done_file_list, ios::out);
+            if (!done_list_.is_open()) {
+                log("Unable to open done list: " + config_.done_file_list, "ERROR");
+                return 1;
+            }
+        }
+
         if (!config_.input_file_list.empty() && !config_.output_file_list.empty()) {
             log("Running in batch mode with file lists");
             run_batch_mode();
@@ -131,12 +148,27 @@ void ncm_app::process_file(const filesystem::path& input_path, const filesystem:
         
         log("Completed: " + input_path.filename().string() + " (" + to_string(duration) + "ms)");
         total_pieces_++;
+        report_done(output_path);
         
     } catch (const exception& e) {
         log("Error processing " + input_path.string() + ": " + e.what(), "ERROR");
     }
 }
 
+/**
+ * @brief Record a finished output path in the done list
+ * @param output_path Output path (without extension) of the converted file
+ * @details Each line is flushed immediately so a consumer reading the list
+ * (e.g. through a pipe) can start on the file while others are converting.
+ */
+void ncm_app::report_done(const filesystem::path& output_path) {
+    if (!done_list_.is_open()) {
+        return;
+    }
+    lock_guard<mutex> lock(done_mtx_);
+    done_list_ << output_path.string() << endl;
+}
+
 /**
  * @brief Run in batch mode using input/output file lists
  * @details Processes files using lists provided via -i and -o flags
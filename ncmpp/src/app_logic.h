@@ -2,6 +2,8 @@
 #include "app_config.h"
 #include <atomic>
 #include <filesystem>
+#include <fstream>
+#include <mutex>
 
 class ncm_app {
 public:
@@ -13,7 +15,10 @@ private:
     void run_fallback_mode();
     void setup_logging() const;
     void process_file(const std::filesystem::path& input_path, const std::filesystem::path& output_path);
+    void report_done(const std::filesystem::path& output_path);
 
     app_config config_;
     std::atomic<int> total_pieces_ = 0;
+    std::ofstream done_list_;
+    std::mutex done_mtx_;
 };
\ No newline at end of file
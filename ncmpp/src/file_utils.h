@@ -24,20 +24,30 @@ inline std::vector<std::filesystem::path> find_files(const std::filesystem::path
     std::vector<std::filesystem::path> files;
     
     // Validate input directory
-    if (!std::filesystem::exists(dir) || !std::filesystem::is_directory(dir)) {
+    std::error_code ec;
+    if (!std::filesystem::is_directory(dir, ec)) {
         return files;
     }
 
-    try {
-        // Recursive directory traversal
-        for (const auto& entry : std::filesystem::recursive_directory_iterator(dir)) {
-            if (entry.is_regular_file() && entry.path().extension() == extension) {
-                files.push_back(entry.path());
-            }
+    // Compare against the extension in the platform's native encoding
+    const std::filesystem::path::string_type suffix = std::filesystem::path(extension).native();
+
+    // Recursive directory traversal; unreadable subdirectories are skipped
+    // rather than ending the scan
+    std::filesystem::recursive_directory_iterator it(
+        dir, std::filesystem::directory_options::skip_permission_denied, ec);
+    const std::filesystem::recursive_directory_iterator end;
+    for (; !ec && it != end; it.increment(ec)) {
+        // Match the suffix on the path string directly; extension() would
+        // build a new path object for every entry. The entry's type comes
+        // from the directory listing, so checking it needs no extra stat.
+        const auto& name = it->path().native();
+        if (name.size() > suffix.size()
+            && name.ends_with(suffix)
+            && name[name.size() - suffix.size() - 1] != std::filesystem::path::preferred_separator
+            && it->is_regular_file(ec)) {
+            files.push_back(it->path());
         }
-    } catch (const std::filesystem::filesystem_error& e) {
-        // Handle filesystem errors gracefully
-        return files;
     }
 
     return files;
@@ -45,6 +45,11 @@ int main(int argc, char* argv[]) {
             "Path to text file for output file list (batch mode) or directory for fallback mode", 
             false, "unlocked");
         
+        // Done list option
+        cmd.add<std::string>("done", 'd',
+            "Path to write each finished output path (without extension) to, one per line",
+            false, "");
+
         // Help option
         cmd.add("help", 'h', "Print this help message");
 
@@ -55,6 +60,7 @@ int main(int argc, char* argv[]) {
         config.thread_count = cmd.get<unsigned int>("threads");
         config.show_time = cmd.exist("showtime");
         config.input_file_list = cmd.get<std::string>("input");
+        config.done_file_list = cmd.get<std::string>("done");
 
         // Determine output mode based on input file list
         std::string output_path_str = cmd.get<std::string>("output");